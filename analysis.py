@@ -9,6 +9,7 @@ import seaborn as sns
 from matplotlib import pyplot as plt
 
 import musana.generics as generics
+import musana.util as util
 from musana.loader import PieceInfo, MetaCorporaInfo
 from musana.harmony_types import TonalHarmony
 import musana.plotting as plotting
@@ -32,6 +33,7 @@ class ChordTransitionAnalysis:
     def plot_heatmaps_to_folder(self, folder_path: str) -> None:
         eras = ['Renaissance', 'Baroque', 'Classical', 'Romantic']
         dpi = 200
+        folder_path = util.ensure_fig_dir(fig_path=folder_path)
 
         self.plot_metacorpora_chord_transitions_heatmap(n=2, view_top_n=30).savefig(
             fname=f'{folder_path}metacorpora_chord_transitions',
@@ -46,9 +48,9 @@ class ChordTransitionAnalysis:
         fig, axs = plt.subplots(ncols=1, nrows=2, figsize=(6 * 2, 5 * 2 * 2))
         fig.suptitle('Chord transitions in metacorpora')
 
+        pieceinfo_list = self.metacorpora.get_annotated_pieces()  # the same pieces for both modes
         for mode, ax in zip(modes, axs):
             cmap = self.cmap_dict[mode]
-            pieceinfo_list = metacorpora.get_annotated_pieces()
             transition_matrix = self.chord_str_transition_matrix(pieceinfo_list=pieceinfo_list, n=n, mode=mode,
                                                                  probability=True)
 
@@ -63,11 +65,14 @@ class ChordTransitionAnalysis:
         fig, axs = plt.subplot_mosaic(axs_keys, figsize=(6 * 2 * 4, 5 * 2 * 2))
         fig.suptitle('Chord transition by era')
 
+        # filter the pieces once per era, each era is plotted for both modes
+        pieceinfo_list_by_era = {era: self.metacorpora.filter_pieces_by_condition(
+            condition=lambda piece_info: piece_info.meta_info.era == era) for era in eras}
+
         for key, ax in axs.items():
             era, mode = key.split('-')
             cmap = self.cmap_dict[mode]
-            era_condition = lambda piece_info: piece_info.meta_info.era == era
-            pieceinfo_list = metacorpora.filter_pieces_by_condition(condition=era_condition)
+            pieceinfo_list = pieceinfo_list_by_era[era]
             transition_matrix = self.chord_str_transition_matrix(pieceinfo_list=pieceinfo_list, n=n, mode=mode,
                                                                  probability=True)
 
@@ -105,12 +110,10 @@ class ChordTransitionAnalysis:
         """This function will return the Sequential of tuples of """
         harmony_condition = lambda tonal_harmony: tonal_harmony.chord_str != ''
         same_local_key = lambda _tuple: all((x.localkey == _tuple[0].localkey for x in _tuple))
-        in_same_mode = lambda _tuple: all((x.localkey.quality == mode for x in _tuple))
+        # all localkeys are equal once same_local_key holds, so the mode is checked on the first one only
+        in_same_mode = lambda _tuple: _tuple[0].localkey.quality == mode
 
-        n_gram_condition = lambda x: all((f(x) for f in [
-            same_local_key,
-            in_same_mode
-        ]))
+        n_gram_condition = lambda x: same_local_key(x) and in_same_mode(x)
         tonal_harmony_transitions = self.piececwise_tonal_harmony_ngrams_from_pieceinfo_list(
             pieceinfo_list=pieceinfo_list,
             harmony_condition=harmony_condition,
@@ -1,19 +1,32 @@
 # Created by Xinyi Guan in 2023.
 import re
+import sys
 import typing
 from dataclasses import dataclass
 import regex_spm
-from pitchtypes import SpelledPitchClass, SpelledIntervalClass
+from pitchtypes import SpelledIntervalClass
 
+_NUMERAL_DEGREE_RE = re.compile("^(?P<modifiers>(b*)|(#*))(?P<roman_numeral>(IV|V?I{0,3}))$", re.I)
 
-@dataclass
+_NUMERAL_TO_DEGREE = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7,
+                      "I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7}
+
+# the regular expression conforms with the DCML annotation standards
+_SN_REGEX = re.compile("^(?P<modifiers>b*|#*)?"  # accidentals, all flats or all sharps
+                       "(?P<roman_numeral>(V(?:II|I)?|I(?:V|II|I)?|v(?:ii|i)?|i(?:v|ii|i)?|Ger|It|Fr|@none))"  # roman numeral
+                       "(?P<form>(%|o|\+|M|\+M))?"  # form
+                       "(?P<figbass>(6[54]?|7|4[32]|2))?"  # figured bass
+                       "(\("
+                       "((?P<added_tones>((\+)([#b])?([2-8]))+|(([#b])?(9|1[0-4]))+)?|"  # added tones, non-chord tones added within parentheses and preceded by a "+" or >8
+                       "(?P<replacement_tones>(([#b])?([2-8]))+)?)"  # replaced chord tones expressed through intervals <= 8
+                       "\))?$", re.ASCII)
+
+
+@dataclass(slots=True)
 class Degree:
     number: int
     alteration: int | bool  # when int: positive for "#", negative for "b", when bool: represent whether to use natural
 
-    numeral_scale_degree_dict = typing.ClassVar[{"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7,
-                                                 "I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7}]
-
     def __add__(self, other: typing.Self) -> typing.Self:
         """
         n steps (0 steps is unison) <-- degree (1 is unison)
@@ -36,18 +49,18 @@ class Degree:
         """
         Examples of arabic_degree: b7, #2, 3, 5, #5, ...
         """
-        ad_regex = re.compile("^((?P<modifiers>(b*)|(#*))?(?P<number>([0-9]+)))$")
-        ad_match = ad_regex.match(arabic_degree)
-
-        if ad_match is None:
-            raise ValueError(f"could not match '{arabic_degree}' with regex: '{ad_regex.pattern}'")
-
-        number_match = ad_match['number']
-        modifiers_match = ad_match['modifiers']
-        alteration = len(modifiers_match) if '#' in modifiers_match else -len(modifiers_match)
+        # scan the accidentals (either all "b" or all "#"), the rest has to be the number:
+        i, n = 0, len(arabic_degree)
+        if n > 0 and arabic_degree[0] in '#b':
+            while i < n and arabic_degree[i] == arabic_degree[0]:
+                i += 1
+        number_str = arabic_degree[i:]
+        if not (number_str.isascii() and number_str.isdigit()):
+            raise ValueError(f"could not parse '{arabic_degree}' as an arabic degree")
+        alteration = i if arabic_degree[:1] == '#' else -i
 
         # create class instance:
-        instance = cls(number=int(number_match), alteration=alteration)
+        instance = cls(number=int(number_str), alteration=alteration)
         return instance
 
     @classmethod
@@ -55,13 +68,12 @@ class Degree:
         """
         Examples of scale degree: bV, bIII, #II, IV, vi, vii
         """
-        nd_regex = re.compile("^(?P<modifiers>(b*)|(#*))(?P<roman_numeral>(IV|V?I{0,3}))$", re.I)
-        nd_match = nd_regex.match(numeral_degree)
+        nd_match = _NUMERAL_DEGREE_RE.match(numeral_degree)
 
         rn_match = nd_match['roman_numeral']
-        degree_number = Degree.numeral_scale_degree_dict.get(rn_match)  # TODO: account for Ger/Fr/It
+        degree_number = _NUMERAL_TO_DEGREE.get(rn_match)  # TODO: account for Ger/Fr/It
         modifiers_match = nd_match['modifiers']
-        degree_alteration = SpelledPitchClass(f'C{modifiers_match}').alteration()
+        degree_alteration = len(modifiers_match) if modifiers_match.startswith('#') else -len(modifiers_match)
         instance = cls(number=degree_number, alteration=degree_alteration)
         return instance
 
@@ -71,7 +83,7 @@ def test_parse():
     print(result)
 
 
-@dataclass
+@dataclass(slots=True)
 class Quality:
     """Defined by the intervals between notes"""
 
@@ -81,45 +93,35 @@ class Quality:
 
 class SingleNumeralRegex:
     modifiers = re.compile("(b*)|(#*)?")  # accidentals
-    roman_numeral = re.compile("VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i|Ger|It|Fr|@none")  # roman numeral
+    roman_numeral = re.compile("V(?:II|I)?|I(?:V|II|I)?|v(?:ii|i)?|i(?:v|ii|i)?|Ger|It|Fr|@none")  # roman numeral
     form = re.compile("(%|o|\+|M|\+M)?")  # form
-    figbass = re.compile("(7|65|43|42|2|64|6)?")  # figured bass
+    figbass = re.compile("(6[54]?|7|4[32]|2)?")  # figured bass
     added_tones = re.compile(
         "((\+)([#b])?([2-8]))+|([#b])?(9|1[0-4])")  # added tones, non-chord tones added within parentheses and preceded by a "+" or >8
     replacement_tones = re.compile("([#b])?([2-8])+")  # replaced chord tones expressed through intervals <= 8
 
 
-def test():
-    _sn_regex = re.compile(
-        "^(?P<modifiers>(b*)|(#*))?"  # accidentals
-        "(?P<roman_numeral>(VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i|Ger|It|Fr|@none))"  # roman numeral
-        "(?P<form>(%|o|\+|M|\+M))?"  # form
-        "(?P<figbass>(7|65|43|42|2|64|6))?"  # figured bass
-        "(\("
-        "((?P<added_tones>((\+)([#b])?([2-8]))+|([#b])?(9|1[0-4]))?|"  # added tones, non-chord tones added within parentheses and preceded by a "+" or >8
-        "(?P<replacement_tones>(([#b])?([2-8]))+)?)"  # replaced chord tones expressed through intervals <= 8
-        "\))?$")
+_TRIAD_FIGBASSES = frozenset({'', '6', '64'})
+
 
+def test():
     # quality= ['M', 'm', '%', 'o', '+', '7', 'M7', 'm7', '%7', 'o7', '+7']
 
     numeral_str = "bII6"
 
-    s_numeral_match = _sn_regex.match(numeral_str)
+    s_numeral_match = _SN_REGEX.match(numeral_str)
     print(f'{s_numeral_match=}')
 
-    # def regex_matching_condition(group_name):
-    #     return s_numeral_match.get(group_name, '')
+    groups = s_numeral_match.groupdict(default='')
 
-    regex_matching_condition = lambda group_name: s_numeral_match[group_name] if s_numeral_match[group_name] else ''
+    modifiers = groups['modifiers']
+    roman_numeral = groups['roman_numeral']
+    form = groups['form']
+    figbass = groups['figbass']
+    added_tones = groups['added_tones']
+    replacement_tones = groups['replacement_tones']
 
-    modifiers = regex_matching_condition('modifiers')
-    roman_numeral = regex_matching_condition('roman_numeral')
-    form = regex_matching_condition('form')
-    figbass = regex_matching_condition('figbass')
-    added_tones = regex_matching_condition('added_tones')
-    replacement_tones = regex_matching_condition('replacement_tones')
-
-    cond_M = roman_numeral.isupper() and figbass in ['', '6', '64']
+    cond_M = roman_numeral.isupper() and figbass in _TRIAD_FIGBASSES
     cond_m = ...
     cond_dim = ...
     cond_aug = ...
@@ -147,7 +149,7 @@ def test_regex_spm():
             print(f"The full `re.Match` object is available as {m.match}")
 
 
-@dataclass
+@dataclass(slots=True)
 class SingleNumeralParts:
     modifiers: str
     roman_numeral: str
@@ -156,32 +158,18 @@ class SingleNumeralParts:
     added_tones: str
     replacement_tones: str
 
-    # the regular expression conforms with the DCML annotation standards
-    _sn_regex = re.compile("^(?P<modifiers>(b*)|(#*))?"  # accidentals
-                           "(?P<roman_numeral>(VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i|Ger|It|Fr|@none))"  # roman numeral
-                           "(?P<form>(%|o|\+|M|\+M))?"  # form
-                           "(?P<figbass>(7|65|43|42|2|64|6))?"  # figured bass
-                           "(\("
-                           "((?P<added_tones>((\+)([#b])?([2-8]))+|(([#b])?(9|1[0-4]))+)?|"  # added tones, non-chord tones added within parentheses and preceded by a "+" or >8
-                           "(?P<replacement_tones>(([#b])?([2-8]))+)?)"  # replaced chord tones expressed through intervals <= 8
-                           "\))?$")
+    _sn_regex = _SN_REGEX
+
     @classmethod
     def parse(cls,numeral_str: str) -> typing.Self:
 
         # match with regex
-        s_numeral_match = SingleNumeralParts._sn_regex.match(numeral_str)
+        s_numeral_match = _SN_REGEX.match(numeral_str)
         if s_numeral_match is None:
-            raise ValueError(f"could not match '{numeral_str}' with regex: '{SingleNumeralParts._sn_regex.pattern}'")
-
-        roman_numeral = s_numeral_match['roman_numeral']
-        modifiers =  s_numeral_match['modifiers'] if s_numeral_match['modifiers'] else ''
-        form = s_numeral_match['form'] if s_numeral_match['form'] else ''
-        figbass = s_numeral_match['figbass'] if s_numeral_match['figbass'] else ''
-        added_tones = s_numeral_match['added_tones'] if s_numeral_match['added_tones'] else ''
-        replacement_tones = s_numeral_match['replacement_tones'] if s_numeral_match['replacement_tones'] else ''
+            raise ValueError(f"could not match '{numeral_str}' with regex: '{_SN_REGEX.pattern}'")
 
-        instance = cls(modifiers=modifiers, roman_numeral=roman_numeral, form=form, figbass=figbass,
-                       added_tones=added_tones,replacement_tones=replacement_tones)
+        # the named groups are the fields:
+        instance = cls(**{name: sys.intern(group) for name, group in s_numeral_match.groupdict(default='').items()})
         return instance
 
 
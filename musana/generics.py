@@ -2,16 +2,18 @@
 from __future__ import annotations
 
 import collections
+import itertools
 import typing
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
 # set typing, Sequential of tuples:
 T = typing.TypeVar('T')
 
 
-@dataclass
+@dataclass(slots=True)
 class Sequential(typing.Generic[T]):
     _seq: typing.Sequence[T]
 
@@ -31,6 +33,11 @@ class Sequential(typing.Generic[T]):
                 raise TypeError()
         return cls(_seq=sequence)
 
+    @classmethod
+    def _from_trusted(cls, sequence: typing.Sequence[T]) -> typing.Self:
+        """Skips the type check of from_sequence, for sequences derived from an already checked Sequential."""
+        return cls(_seq=sequence)
+
     @classmethod
     def join(cls, sequentials: typing.Sequence[Sequential]) -> Sequential:
         """
@@ -38,7 +45,8 @@ class Sequential(typing.Generic[T]):
         :param sequentials:
         :return:
         """
-        joined_seq = sum([x._seq for x in sequentials], [])
+        # chain the sequences lazily into one list, sum() would copy the accumulated list for every sequential
+        joined_seq = list(itertools.chain.from_iterable(x._seq for x in sequentials))
         sequential = cls.from_sequence(joined_seq)
         return sequential
 
@@ -49,7 +57,7 @@ class Sequential(typing.Generic[T]):
 
     def filter_by_condition(self, condition: typing.Callable[[T, ], bool]) -> Sequential:
         sequence = [x for x in self._seq if condition(x)]
-        sequential = self.from_sequence(sequence=sequence)
+        sequential = self._from_trusted(sequence=sequence)
         return sequential
 
     def get_n_grams(self, n: int) -> ST:
@@ -58,9 +66,10 @@ class Sequential(typing.Generic[T]):
         :param n:
         :return:
         """
-        length = len(self._seq)
-        n_grams = [tuple(self._seq[i:i + n]) for i in range(length - n + 1)]
-        n_grams = Sequential.from_sequence(sequence=n_grams)
+        num_n_grams = max(len(self._seq) - n + 1, 0)
+        # zip n shifted views of the sequence, instead of slicing a new window for each position
+        n_grams = list(zip(*(self._seq[i:i + num_n_grams] for i in range(n))))
+        n_grams = Sequential._from_trusted(sequence=n_grams)
         return n_grams
 
     def get_transition_matrix(self, probability: bool) -> pd.DataFrame:
@@ -74,12 +83,13 @@ class Sequential(typing.Generic[T]):
         count = collections.Counter(self._seq)
         top_common_objects = [x for x, number in count.most_common()]
 
-        transition_matrix = pd.DataFrame(0, columns=top_common_objects, index=top_common_objects)
+        # count the bigrams on integer codes (rank in top_common_objects), with one bincount over the flat index
+        code_dict = {x: i for i, x in enumerate(top_common_objects)}
+        codes = np.fromiter((code_dict[x] for x in self._seq), dtype=np.intp, count=len(self._seq))
+        k = len(top_common_objects)
+        counts = np.bincount(codes[:-1] * k + codes[1:], minlength=k * k).reshape(k, k)
 
-        bigrams = self.get_n_grams(n=2)
-        for bigram in bigrams._seq:
-            source, target = bigram
-            transition_matrix.loc[str(source), str(target)] += 1
+        transition_matrix = pd.DataFrame(counts, columns=top_common_objects, index=top_common_objects)
 
         if probability:
             transition_prob = transition_matrix.divide(transition_matrix.sum(axis=1), axis=0)
@@ -3,17 +3,17 @@
 from __future__ import annotations
 
 import re
+import sys
 import typing
 from abc import abstractmethod
-from dataclasses import dataclass
-from functools import cache
+from dataclasses import dataclass, fields
+from functools import cache, lru_cache
 
+import pandas as pd
 import regex_spm
 from pitchtypes import SpelledPitchClass as _SpelledPitchClass
 from pitchtypes import SpelledIntervalClass as SpelledIntervalClass
 
-T = typing.TypeVar('T')
-
 
 class SpelledPitchClass(_SpelledPitchClass):
 
@@ -56,38 +56,40 @@ class Key:
     _M_intervals = ['P1', 'M2', 'M3', 'P4', 'P5', 'M6', 'M7']
     _m_intervals = ['P1', 'M2', 'm3', 'P4', 'P5', 'm6', 'm7']
 
-    @classmethod
-    def parse(cls, key_str: str) -> Key:
+    _key_regex = re.compile("^(?P<class>[A-G])(?P<modifiers>(b*)|(#*))$", re.I)  # case-insensitive
 
-        _key_regex = re.compile("^(?P<class>[A-G])(?P<modifiers>(b*)|(#*))$", re.I)  # case-insensitive
+    def __hash__(self) -> int:
+        # pitchtypes' SpelledPitchClass is not hashable, hash the root by its position on the line of fifths
+        return hash((self.root.fifths(), self.mode))
 
+    @classmethod
+    @lru_cache(maxsize=128)
+    def parse(cls, key_str: str) -> Key:
+        # memoized, there are only a few dozen key labels and the instances are frozen,
+        # so the root SpelledPitchClass is not rebuilt for every row of a table
         if not isinstance(key_str, str):
             raise TypeError(f"expected string as input, got {key_str}")
-        key_match = _key_regex.match(key_str)
+        key_match = cls._key_regex.match(key_str)
         if key_match is None:
-            raise ValueError(f"could not match '{key_str}' with regex: '{_key_regex.pattern}'")
+            raise ValueError(f"could not match '{key_str}' with regex: '{cls._key_regex.pattern}'")
         mode = 'M' if key_match['class'].isupper() else 'm'
         root = SpelledPitchClass(key_match['class'].upper() + key_match['modifiers'])
         instance = cls(root=root, mode=mode)
         return instance
 
     def find_pc(self, degree: Degree) -> SpelledPitchClass:
-        if self.mode == 'M':
-            intervals = self._M_intervals
-        elif self.mode == 'm':
-            intervals = self._m_intervals
-        else:
-            raise ValueError(f'{self.mode=}')
-        interval = intervals[degree.number - 1]
-        pc = self.root + SpelledIntervalClass(interval)
-        pc = SpelledPitchClass(pc.name())  # TODO: do it in the right way later (look up customized SpelledPitchClass)
-        pc = pc - pc.alteration_ic()
+        pc = _degree_pc_table(key=self)[degree.number - 1]
         return pc
 
     @property
-    @cache
     def pcs(self) -> typing.List[SpelledPitchClass]:
-        return [self.find_pc(degree=Degree(number=n, alteration=0)) for n in range(1, 8)]
+        return list(_degree_pc_table(key=self))
+
+    def non_diatonic_pcs(self, pcs: typing.Iterable[SpelledPitchClass]) -> typing.List[SpelledPitchClass]:
+        """Returns the pitch classes in pcs that are not in the scale of this key."""
+        scale_fifths = _scale_fifths(key=self)
+        non_diatonic_pcs = [x for x in pcs if x.fifths() not in scale_fifths]
+        return non_diatonic_pcs
 
     def to_str(self) -> str:
         if self.mode == 'm':
@@ -99,16 +101,44 @@ class Key:
         return resulting_str
 
 
-@dataclass
+_NUMERAL_TO_DEGREE = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7,
+                      "I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7}
+
+
+@cache
+def _degree_pc_table(key: Key) -> typing.Tuple[SpelledPitchClass, ...]:
+    """The pitch classes of the scale degrees 1 to 7 of a key, computed once per key."""
+    if key.mode == 'M':
+        intervals = key._M_intervals
+    elif key.mode == 'm':
+        intervals = key._m_intervals
+    else:
+        raise ValueError(f'{key.mode=}')
+    pcs = []
+    for interval in intervals:
+        pc = key.root + SpelledIntervalClass(interval)
+        pc = SpelledPitchClass(pc.name())  # TODO: do it in the right way later (look up customized SpelledPitchClass)
+        pc = pc - pc.alteration_ic()
+        pcs.append(pc)
+    return tuple(pcs)
+
+
+@cache
+def _scale_fifths(key: Key) -> typing.FrozenSet[int]:
+    """The scale of a key as a set of line-of-fifths positions, computed once per key."""
+    # spelled from the root and the scale intervals directly, key.pcs drops the accidentals of the scale degrees
+    intervals = key._M_intervals if key.mode == 'M' else key._m_intervals
+    root_fifths = key.root.fifths()
+    return frozenset(root_fifths + SpelledIntervalClass(interval).fifths() for interval in intervals)
+
+
+@dataclass(slots=True)
 class Degree:
     number: int
     alteration: int | bool  # when int: positive for "#", negative for "b", when bool: represent whether to use natural
 
-    _numeral_scale_degree_dict = typing.ClassVar[{"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7,
-                                                  "I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7}]
-
     _regex_arabic = re.compile("^((?P<modifiers>(b*)|(#*))?(?P<number>([0-9]+)))$")
-    _regex_roman = re.compile("^(?P<modifiers>(b*)|(#*))(?P<roman_numeral>(IV|V?I{0,2}))$", re.I)
+    _regex_roman = re.compile("^(?P<modifiers>(b*)|(#*))(?P<roman_numeral>(VII|VI|V|IV|III|II|I))$", re.I)
 
     def __add__(self, other: typing.Self) -> typing.Self:
         """
@@ -118,14 +148,20 @@ class Degree:
         n steps (0 steps is unison) --> degree (1 is unison)
 
         """
-        number = ((self.number - 1) + (other.number - 1)) % 7 + 1
-        alteration = other.alteration
-        return Degree(number=number, alteration=alteration)
+        return Degree(number=self._add_num(self.number, other.number), alteration=other.alteration)
 
     def __sub__(self, other: typing.Self) -> typing.Self:
-        number = ((self.number - 1) - (other.number - 1)) % 7 + 1
-        alteration = other.alteration
-        return Degree(number=number, alteration=alteration)
+        return Degree(number=self._sub_num(self.number, other.number), alteration=other.alteration)
+
+    @staticmethod
+    def _add_num(a: int, b: int) -> int:
+        """Degree number of a + b, works element-wise on numpy arrays of degree numbers as well."""
+        return ((a - 1) + (b - 1)) % 7 + 1
+
+    @staticmethod
+    def _sub_num(a: int, b: int) -> int:
+        """Degree number of a - b, works element-wise on numpy arrays of degree numbers as well."""
+        return ((a - 1) - (b - 1)) % 7 + 1
 
     @classmethod
     def parse(cls, degree_str: str) -> typing.Self:
@@ -133,16 +169,21 @@ class Degree:
         Examples of arabic_degree: b7, #2, 3, 5, #5, ...
         Examples of scale degree: bV, bIII, #II, IV, vi, vii
         """
+        # an unaltered roman numeral (e.g. the roman_numeral part of a numeral) is one lookup in the case-merged table
+        degree_number = _NUMERAL_TO_DEGREE.get(degree_str)
+        if degree_number is not None:
+            return cls(number=degree_number, alteration=0)
+
         match = regex_spm.fullmatch_in(degree_str)
         match match:
             case cls._regex_roman:
-                degree_number = cls._numeral_scale_degree_dict.get(match['roman_numeral'])
+                degree_number = _NUMERAL_TO_DEGREE.get(match['roman_numeral'])
             case cls._regex_arabic:
                 degree_number = int(match['number'])
             case _:
                 raise ValueError(f"could not match {match} with regex: {cls._regex_roman} or {cls._regex_arabic}")
-        modifiers_match = match['modifiers']
-        alteration = SpelledPitchClass(f'C{modifiers_match}').alteration()
+        modifiers_match = match['modifiers'] or ''  # either all "b" or all "#"
+        alteration = len(modifiers_match) if modifiers_match.startswith('#') else -len(modifiers_match)
         instance = cls(number=degree_number, alteration=alteration)
         return instance
 
@@ -223,7 +264,7 @@ class ReplacementTones:
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class SingleNumeralParts:
     roman_numeral: str
     modifiers: str | None
@@ -233,14 +274,14 @@ class SingleNumeralParts:
     replacement_tones: str | None
 
     # the regular expression conforms with the DCML annotation standards
-    _sn_regex = re.compile("^(?P<modifiers>(b*)|(#*))?"  # accidentals
-                           "(?P<roman_numeral>(VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i|Ger|It|Fr|@none))"  # roman numeral
+    _sn_regex = re.compile("^(?P<modifiers>b*|#*)?"  # accidentals, all flats or all sharps
+                           "(?P<roman_numeral>(V(?:II|I)?|I(?:V|II|I)?|v(?:ii|i)?|i(?:v|ii|i)?|Ger|It|Fr|@none))"  # roman numeral
                            "(?P<form>(%|o|\+|M|\+M))?"  # form
-                           "(?P<figbass>(7|65|43|42|2|64|6))?"  # figured bass
+                           "(?P<figbass>(6[54]?|7|4[32]|2))?"  # figured bass
                            "(\("
                            "((?P<added_tones>((\+)([#b])?([2-8]))+|(([#b])?(9|1[0-4]))+)?|"  # added tones, non-chord tones added within parentheses and preceded by a "+" or >8
                            "(?P<replacement_tones>(([#b])?([2-8]))+)?)"  # replaced chord tones expressed through intervals <= 8
-                           "\))?$")
+                           "\))?$", re.ASCII)
 
     @classmethod
     def parse(cls, numeral_str: str) -> typing.Self:
@@ -249,17 +290,45 @@ class SingleNumeralParts:
         if s_numeral_match is None:
             raise ValueError(f"could not match '{numeral_str}' with regex: '{SingleNumeralParts._sn_regex.pattern}'")
 
-        roman_numeral = s_numeral_match['roman_numeral']
-        modifiers = s_numeral_match['modifiers'] if s_numeral_match['modifiers'] else None
-        form = s_numeral_match['form'] if s_numeral_match['form'] else None
-        figbass = s_numeral_match['figbass'] if s_numeral_match['figbass'] else None
-        added_tones = s_numeral_match['added_tones'] if s_numeral_match['added_tones'] else None
-        replacement_tones = s_numeral_match['replacement_tones'] if s_numeral_match['replacement_tones'] else None
+        # the named groups are the fields, store the empty ones as None:
+        instance = cls(**{name: sys.intern(group) if group else None
+                          for name, group in s_numeral_match.groupdict().items()})
+        return instance
 
-        instance = cls(modifiers=modifiers, roman_numeral=roman_numeral, form=form, figbass=figbass,
-                       added_tones=added_tones, replacement_tones=replacement_tones)
+
+@dataclass
+class SingleNumeralPartsArray:
+    """
+    The parts of a whole column of numeral strings, stored as one pd.Series per part (aligned with the input index)
+    instead of one SingleNumeralParts object per numeral. Empty parts and unparsable numerals are NaN.
+    """
+    roman_numeral: pd.Series
+    modifiers: pd.Series
+    form: pd.Series
+    figbass: pd.Series
+    added_tones: pd.Series
+    replacement_tones: pd.Series
+
+    _seventh_chord_figbasses = frozenset({'7', '65', '43', '42', '2'})
+
+    @classmethod
+    def from_series(cls, numeral_strs: pd.Series) -> typing.Self:
+        parts_df = numeral_strs.str.extract(SingleNumeralParts._sn_regex, expand=True)
+        parts_df = parts_df.where(parts_df != '')
+        instance = cls(**{field.name: parts_df[field.name] for field in fields(SingleNumeralParts)})
         return instance
 
+    def __len__(self):
+        return len(self.roman_numeral)
+
+    def is_major(self) -> pd.Series:
+        """Whether the roman numeral is upper case, per numeral."""
+        return self.roman_numeral.str.isupper()
+
+    def has_seventh(self) -> pd.Series:
+        """Whether the figured bass denotes a seventh chord, per numeral."""
+        return self.figbass.isin(self._seventh_chord_figbasses)
+
 
 class SnpParsable(typing.Protocol):
     @classmethod
@@ -344,33 +413,52 @@ class SingleNumeral(ProtocolHarmony):
         pass
 
 
-@dataclass
-class Chain(typing.Generic[T]):
-    head: T
-    tail: typing.Optional[Chain[T]]
-
+@dataclass(frozen=True, slots=True)
+class Numeral:
+    """
+    A numeral together with its chain of relative roots, e.g. "vii%7/IV" or "##III/bIV/V", as a flat tuple:
+    numerals[0] is the numeral itself and each following one is the relative root of the one before.
+    """
+    numerals: typing.Tuple[SingleNumeral, ...]
+    key: Key
 
-class Numeral(Chain[SingleNumeral]):
     numeral_regex = re.compile(
-        "^(?P<numeral>[b#]*(?:VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i|Ger|It|Fr|@none))(?P<form>%|o|\+|M|\+M)?(?P<figbass>7|65|43|42|2|64|6)?(?:\((?P<changes>(?:[\+-\^v]?[b#]*\d)+)\))?(?:/(?P<relativeroot>(?:[b#]*(?:VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i)/?)*))?$")
+        "^(?P<numeral>[b#]*(?:V(?:II|I)?|I(?:V|II|I)?|v(?:ii|i)?|i(?:v|ii|i)?|Ger|It|Fr|@none))(?P<form>%|o|\+|M|\+M)?(?P<figbass>6[54]?|7|4[32]|2)?(?:\((?P<changes>(?:[\+-\^v]?[b#]*\d)+)\))?(?:/(?P<relativeroot>(?:[b#]*(?:V(?:II|I)?|I(?:V|II|I)?|v(?:ii|i)?|i(?:v|ii|i)?)/?)*))?$")
 
     @classmethod
-    def parse(cls, key_str: str, numeral_str: str) -> typing.Self:
+    @lru_cache(maxsize=1024)
+    def parse(cls, key_str: str | Key, numeral_str: str) -> typing.Self:
         # numeral_str examples: "#ii/V", "##III/bIV/V", "bV", "IV(+6)", "vii%7/IV"
+        # memoized, the same few localkey labels recur on most rows of a piece (the instances are frozen)
 
-        if "/" in numeral_str:
-            L_numeral_str, R_numeral_str = numeral_str.split("/", maxsplit=1)
-            R = cls.parse(key_str=key_str, numeral_str=R_numeral_str)
-            # todo: makesure the key works
-            L = SingleNumeral.parse(key_str=R.head.key_if_tonicized(), numeral_str=L_numeral_str)
+        # resolve the key once, SingleNumeral.parse then receives a Key:
+        key = key_str if isinstance(key_str, Key) else Key.parse(key_str=key_str)
 
-        else:
-            L = SingleNumeral.parse(key_str=key_str, numeral_str=numeral_str)
-            R = None
+        # the right-most numeral is in the given key, every other one in the key tonicized by its right neighbour
+        single_numeral_strs = numeral_str.split("/")
+        numerals = [SingleNumeral.parse(key_str=key, numeral_str=single_numeral_strs[-1])]
+        for single_numeral_str in reversed(single_numeral_strs[:-1]):
+            # todo: makesure the key works
+            numerals.append(SingleNumeral.parse(key_str=numerals[-1].key_if_tonicized(),
+                                                numeral_str=single_numeral_str))
+        numerals.reverse()
 
-        instance = cls(head=L, tail=R)
+        instance = cls(numerals=tuple(numerals), key=key)
         return instance
 
+    @classmethod
+    def parse_series(cls, numeral_strs: pd.Series) -> pd.DataFrame:
+        """
+        Split a whole column of numeral strings into their named groups (numeral, form, figbass, changes,
+        relativeroot) with one str.extract, aligned with the input index. Unparsable numerals give NaN rows.
+        """
+        parts_df = numeral_strs.str.extract(cls.numeral_regex, expand=True)
+        return parts_df
+
+    @property
+    def head(self) -> SingleNumeral:
+        return self.numerals[0]
+
 
 @dataclass(frozen=True)
 class TonalHarmony(ProtocolHarmony):
@@ -382,8 +470,8 @@ class TonalHarmony(ProtocolHarmony):
     def parse(cls, globalkey_str: str, localkey_numeral_str: str, chord_str: str) -> typing.Self:
         # chord_str examples: "IV(+6)", "vii%7/IV", "ii64"
         globalkey = Key.parse(key_str=globalkey_str)
-        localkey = Numeral.parse(key_str=globalkey_str, numeral_str=localkey_numeral_str).head.key_if_tonicized()
-        compound_numeral = Numeral.parse(key_str=localkey.to_str(), numeral_str=chord_str)
+        localkey = Numeral.parse(key_str=globalkey, numeral_str=localkey_numeral_str).head.key_if_tonicized()
+        compound_numeral = Numeral.parse(key_str=localkey, numeral_str=chord_str)
         instance = cls(globalkey=globalkey, numeral=compound_numeral,
                        bookeeping={'globalkey_str': globalkey_str,
                                    'localkey_numeral_str': localkey_numeral_str,
@@ -391,6 +479,33 @@ class TonalHarmony(ProtocolHarmony):
                                    })
         return instance
 
+    @classmethod
+    def parse_batch(cls, globalkey_strs: typing.Iterable[str], localkey_numeral_strs: typing.Iterable[str],
+                    chord_strs: typing.Iterable[str], memoize: bool = True) -> typing.List[typing.Self]:
+        """
+        Parse the parallel columns of an annotation table (e.g. the "globalkey", "localkey" and "chord" columns
+        of a harmonies dataframe) in one pass, without building a row object for each chord.
+        With memoize, each distinct (globalkey, localkey, chord) row is parsed once and its (frozen) instance reused,
+        set it to False for tables with few repeated rows.
+        """
+        rows = zip(globalkey_strs, localkey_numeral_strs, chord_strs)
+        if not memoize:
+            return [cls._parse_row(row) for row in rows]
+
+        parsed_rows: typing.Dict[typing.Tuple[str, str, str], typing.Self] = {}
+        instances = []
+        for row in rows:
+            instance = parsed_rows.get(row)
+            if instance is None:
+                instance = parsed_rows[row] = cls._parse_row(row)
+            instances.append(instance)
+        return instances
+
+    @classmethod
+    def _parse_row(cls, row: typing.Tuple[str, str, str]) -> typing.Self:
+        globalkey_str, localkey_numeral_str, chord_str = row
+        return cls.parse(globalkey_str=globalkey_str, localkey_numeral_str=localkey_numeral_str, chord_str=chord_str)
+
     def pc_set(self) -> typing.List[SpelledPitchClass]:
         pitchclass = self.chord_tones() | self.added_tones()
         return pitchclass
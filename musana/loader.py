@@ -1,6 +1,7 @@
 # Created by Xinyi Guan in 2022.
 from __future__ import annotations
 
+import itertools
 import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
@@ -188,10 +189,15 @@ class PieceInfo:
     key_info: KeyInfo
 
     @classmethod
-    def from_directory(cls, parent_corpus_path: str, piece_name: str) -> PieceInfo:
+    def from_directory(cls, parent_corpus_path: str, piece_name: str,
+                       metadata_tsv_df: pd.DataFrame | None = None) -> PieceInfo:
+        """metadata_tsv_df: the metadata.tsv of the parent corpus, read from the directory if not given."""
 
         corpus_name: str = parent_corpus_path.split(os.sep)[-2]
-        metadata_tsv_df: pd.DataFrame = pd.read_csv(parent_corpus_path + 'metadata.tsv', sep='\t')
+        if metadata_tsv_df is None:
+            metadata_tsv_df = pd.read_csv(parent_corpus_path + 'metadata.tsv', sep='\t')
+        # the metadata row of this piece, looked up once:
+        piece_metadata: pd.Series = metadata_tsv_df.loc[metadata_tsv_df['fnames'] == piece_name].iloc[0]
 
         try:
             harmonies_df: pd.DataFrame = pd.read_csv(parent_corpus_path + 'harmonies/' + piece_name + '.tsv', sep='\t')
@@ -209,21 +215,26 @@ class PieceInfo:
 
         piece_length = harmonies_df.shape[0]
 
-        piece_name_SeqData: SequentialData = SequentialData.from_pd_series(pd.Series([piece_name] * piece_length))
-        corpus_name_SeqData: SequentialData = SequentialData.from_pd_series(pd.Series([corpus_name] * piece_length))
+        # the label columns are constant within a piece, store them as categoricals (one code per row)
+        piece_name_SeqData: SequentialData = SequentialData.from_pd_series(
+            pd.Series([piece_name] * piece_length, dtype='category'))
+        corpus_name_SeqData: SequentialData = SequentialData.from_pd_series(
+            pd.Series([corpus_name] * piece_length, dtype='category'))
 
-        annotated_key: str = metadata_tsv_df.loc[metadata_tsv_df['fnames'] == piece_name]['annotated_key'].values[0]
-        annotated_key_SeqData = SequentialData.from_pd_series(pd.Series([annotated_key] * piece_length))
+        annotated_key: str = piece_metadata['annotated_key']
+        annotated_key_SeqData = SequentialData.from_pd_series(
+            pd.Series([annotated_key] * piece_length, dtype='category'))
 
-        composed_start: int = metadata_tsv_df.loc[metadata_tsv_df['fnames'] == piece_name]['composed_start'].values[0]
+        composed_start: int = piece_metadata['composed_start']
         composed_start_SeqData: SequentialData = SequentialData.from_pd_series(
             pd.Series([composed_start] * piece_length))
 
-        composed_end: int = metadata_tsv_df.loc[metadata_tsv_df['fnames'] == piece_name]['composed_end'].values[0]
+        composed_end: int = piece_metadata['composed_end']
         composed_end_SeqData: SequentialData = SequentialData.from_pd_series(pd.Series([composed_end] * piece_length))
 
-        composer: SequentialData = SequentialData.from_pd_series(pd.Series([corpus_name.split('_')[0]] * piece_length))
-        label_count = metadata_tsv_df.loc[metadata_tsv_df['fnames'] == piece_name]['label_count'].values[0]
+        composer: SequentialData = SequentialData.from_pd_series(
+            pd.Series([corpus_name.split('_')[0]] * piece_length, dtype='category'))
+        label_count = piece_metadata['label_count']
 
         meta_info = PieceMetaData(
             corpus_path=parent_corpus_path,
@@ -257,15 +268,11 @@ class PieceInfo:
     def get_tonal_harmony_sequential(self) -> Sequential:
         """Essentially get the "chord" column from the dataframe and transform each chord to a TonalHarmony object. """
         dropped_nan_df = self.harmony_info._df.dropna(how='any', subset=['chord', 'globalkey', 'localkey'])
-        dropped_nan_df = dropped_nan_df.reset_index(drop=True)
-
-        def create_tonal_harmony(row):
-            return TonalHarmony.parse(globalkey_str=row['globalkey'],
-                                      localkey_str=row['localkey'],
-                                      chord_str=row['chord'])
 
-        # Create a list of TonalHarmony objects using the create_tonal_harmony() function
-        tonal_harmony_list = dropped_nan_df.apply(create_tonal_harmony, axis=1)
+        # Create a list of TonalHarmony objects, parsing the columns directly instead of row by row
+        tonal_harmony_list = TonalHarmony.parse_batch(globalkey_strs=dropped_nan_df['globalkey'],
+                                                      localkey_numeral_strs=dropped_nan_df['localkey'],
+                                                      chord_strs=dropped_nan_df['chord'])
 
         # Create a Sequential object from the list of TonalHarmony objects
         tonal_harmony_sequential = Sequential.from_sequence(tonal_harmony_list)
@@ -301,8 +308,9 @@ class CorpusInfo(BaseCorpusInfo):
 
         # don't count pieces with label_count=0, and annotated_key is empty
         piecename_list = metadata_tsv_df.loc[metadata_tsv_df['label_count'] != 0]['fnames']
-        pieceinfo_list = [PieceInfo.from_directory(parent_corpus_path=corpus_path, piece_name=item) for item in
-                          piecename_list]
+        # pass the metadata on, instead of reading metadata.tsv again for every piece
+        pieceinfo_list = [PieceInfo.from_directory(parent_corpus_path=corpus_path, piece_name=item,
+                                                   metadata_tsv_df=metadata_tsv_df) for item in piecename_list]
 
         try:
             harmonies_df: pd.DataFrame = pd.concat([item.harmony_info._df for item in pieceinfo_list])
@@ -324,13 +332,14 @@ class CorpusInfo(BaseCorpusInfo):
         concat_composed_end_series = pd.concat([item.meta_info.composed_end._series for item in pieceinfo_list])
         composed_end_SeqData = SequentialData.from_pd_series(series=concat_composed_end_series)
 
+        # categoricals with different categories concatenate to object dtype, rebuild the (union) categories
         corpusname_SeqData = SequentialData.from_pd_series(
-            series=pd.concat([item.meta_info.corpus_name._series for item in pieceinfo_list]))
+            series=pd.concat([item.meta_info.corpus_name._series for item in pieceinfo_list]).astype('category'))
         composer_SeqData = SequentialData.from_pd_series(
-            series=pd.concat([item.meta_info.composer._series for item in pieceinfo_list]))
+            series=pd.concat([item.meta_info.composer._series for item in pieceinfo_list]).astype('category'))
 
         annotated_key_SeqData = SequentialData.from_pd_series(
-            series=pd.concat([item.meta_info.annotated_key._series for item in pieceinfo_list]))
+            series=pd.concat([item.meta_info.annotated_key._series for item in pieceinfo_list]).astype('category'))
 
         meta_info = CorpusMetaData(
             corpus_name=corpusname_SeqData,
@@ -359,8 +368,9 @@ class MetaCorporaInfo(BaseCorpusInfo):
     key_info: KeyInfo
 
     def filter_pieces_by_condition(self, condition: Callable[[PieceInfo, ], bool]) -> List[PieceInfo]:
-        filtered_pieces = sum([corpusinfo.filter_pieces_by_condition(condition=condition) for corpusinfo in
-                               self.meta_info.corpusinfo_list], [])
+        # chain the per-corpus results, instead of sum()-ing the lists (quadratic copying)
+        filtered_pieces = list(itertools.chain.from_iterable(
+            corpusinfo.filter_pieces_by_condition(condition=condition) for corpusinfo in self.meta_info.corpusinfo_list))
         return filtered_pieces
 
     def get_annotated_pieces(self) -> List[PieceInfo]:
@@ -398,12 +408,12 @@ class MetaCorporaInfo(BaseCorpusInfo):
         composed_end_SeqData = SequentialData.from_pd_series(series=concat_composed_end_series)
 
         corporaname_SeqData = SequentialData.from_pd_series(
-            series=pd.concat([item.meta_info.corpus_name._series for item in corpusinfo_list]))
+            series=pd.concat([item.meta_info.corpus_name._series for item in corpusinfo_list]).astype('category'))
         composer_SeqData = SequentialData.from_pd_series(
-            series=pd.concat([item.meta_info.composer._series for item in corpusinfo_list]))
+            series=pd.concat([item.meta_info.composer._series for item in corpusinfo_list]).astype('category'))
 
         annotated_key_SeqData = SequentialData.from_pd_series(
-            series=pd.concat([item.meta_info.annotated_key._series for item in corpusinfo_list]))
+            series=pd.concat([item.meta_info.annotated_key._series for item in corpusinfo_list]).astype('category'))
 
         meta_info = MetaCorporaMetaData(corpora_names=corporaname_SeqData,
                                         composer=composer_SeqData,
@@ -1,5 +1,6 @@
 # Created by Xinyi Guan in 2022.
 
+import os
 from typing import Sequence
 
 import numpy as np
@@ -18,8 +19,18 @@ def get_n_grams(sequence: Sequence[object], n: int) -> np.ndarray:
     :param n:
     :return:
     """
-    transitions = np.array(
-        [['_'.join(map(str, sequence[i - (n - 1):i])), str(sequence[i])] for i in range(n - 1, len(sequence))])
+    labels = np.array([str(x) for x in sequence])
+    if len(labels) < n:
+        return np.array([])
+    # row i of windows is the n-gram starting at position i, a view without copying
+    windows = np.lib.stride_tricks.sliding_window_view(labels, n)
+    if n == 1:
+        contexts = np.full(windows.shape[0], '')
+    else:
+        contexts = windows[:, 0]
+        for i in range(1, n - 1):
+            contexts = np.char.add(np.char.add(contexts, '_'), windows[:, i])
+    transitions = np.stack([contexts, windows[:, -1]], axis=1)
     return transitions
 
 
@@ -29,12 +40,12 @@ def get_transition_matrix(n_grams: np.ndarray) -> pd.DataFrame:
     :param n_grams:
     :return:
     """
-    contexts, targets = np.unique(n_grams[:, 0]), np.unique(n_grams[:, 1])
-    transition_matrix = pd.DataFrame(0, columns=targets, index=contexts)
-    for i, n_gram in enumerate(n_grams):
-        context, target = n_gram[0], n_gram[1]
-        transition_matrix.loc[context, target] += 1
-        # print(transition_matrix)
+    # integer codes of the (sorted) contexts and targets, then one bincount over the flat (context, target) index
+    contexts, targets = pd.Categorical(n_grams[:, 0]), pd.Categorical(n_grams[:, 1])
+    num_contexts, num_targets = len(contexts.categories), len(targets.categories)
+    flat_idx = contexts.codes.astype(np.int64) * num_targets + targets.codes.astype(np.int64)
+    counts = np.bincount(flat_idx, minlength=num_contexts * num_targets).reshape(num_contexts, num_targets)
+    transition_matrix = pd.DataFrame(counts, columns=targets.categories, index=contexts.categories)
     return transition_matrix
 
 
@@ -70,6 +81,18 @@ MAJOR_MINOR_KEYS_Dict = {'A': 'major', 'B': 'major', 'C': 'major', 'D': 'major',
 # seaborn plot                          |
 # ===================================
 
+def ensure_fig_dir(fig_path: str | None = None) -> str:
+    """
+    Returns the folder to save the figures in (default '../figs/'), created if it does not exist yet.
+    An empty fig_path is the current directory.
+    """
+    if fig_path is None:
+        fig_path = '../figs/'
+    if fig_path:
+        os.makedirs(fig_path, exist_ok=True)
+    return fig_path
+
+
 def set_palette_6():
     sns.set()
     sns.set_style("white")
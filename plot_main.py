@@ -1,5 +1,6 @@
 # Created by Xinyi Guan in 2022.
-from typing import Literal
+from functools import lru_cache
+from typing import Callable, Dict, Literal
 
 import pandas as pd
 import pitchtypes
@@ -11,6 +12,21 @@ from musana.loader import MetaCorporaInfo, SequentialData
 from musana.harmony_types import ModulationBigram
 
 
+@lru_cache(maxsize=None)
+def _load_metacorpora(metacorpora_path: str) -> MetaCorporaInfo:
+    """Loads the metacorpora once per path, the assemble_* functions below share the loaded instance."""
+    metacorpora = MetaCorporaInfo.from_directory(metacorpora_path=metacorpora_path)
+    return metacorpora
+
+
+# the entropy of a local key sequence, by entropy_type:
+_LOCALKEY_ENTROPY: Dict[str, Callable[[SequentialData], float]] = {
+    'full_seq': lambda local_key: local_key.entropy(),
+    'changes_seq': lambda local_key: local_key.get_changes().entropy(),
+    'unique_seq': lambda local_key: local_key.unique_labels().entropy(),
+}
+
+
 def assemble_piece_localkey_entropy_df(metacorpora_path: str,
                                        entropy_type: Literal['full_seq', 'changes_seq', 'unique_seq']) -> pd.DataFrame:
     """
@@ -18,27 +34,18 @@ def assemble_piece_localkey_entropy_df(metacorpora_path: str,
     The entropy of key labels in a piece
     """
 
-    metacorpora = MetaCorporaInfo.from_directory(metacorpora_path=metacorpora_path)
+    metacorpora = _load_metacorpora(metacorpora_path=metacorpora_path)
+
+    if entropy_type not in _LOCALKEY_ENTROPY:
+        raise ValueError(f'Unexpected {entropy_type}')
+    localkey_entropy = _LOCALKEY_ENTROPY[entropy_type]
 
     entropy_df_list = []
     for corpusinfo in metacorpora.meta_info.corpusinfo_list:
         piece_names = pd.Series([item for item in corpusinfo.meta_info.piecename_list], name='piece')
-        if entropy_type == 'full_seq':
-            piece_localkey_entropy = pd.Series(
-                [item.key_info.local_key.entropy() for item in corpusinfo.meta_info.pieceinfo_list],
-                name='entropy')
-
-        elif entropy_type == 'changes_seq':
-            piece_localkey_entropy = pd.Series(
-                [item.key_info.local_key.get_changes().entropy() for item in corpusinfo.meta_info.pieceinfo_list],
-                name='entropy')
-
-        elif entropy_type == 'unique_seq':
-            piece_localkey_entropy = pd.Series(
-                [item.key_info.local_key.unique_labels().entropy() for item in corpusinfo.meta_info.pieceinfo_list],
-                name='entropy')
-        else:
-            raise ValueError(f'Unexpected {entropy_type}')
+        piece_localkey_entropy = pd.Series(
+            [localkey_entropy(item.key_info.local_key) for item in corpusinfo.meta_info.pieceinfo_list],
+            name='entropy')
 
         piece_year = pd.Series(
             [item.meta_info.composed_end._series.values[0] for item in corpusinfo.meta_info.pieceinfo_list],
@@ -55,6 +62,8 @@ def assemble_piece_localkey_entropy_df(metacorpora_path: str,
         localkey_entropy_df = pd.DataFrame(frame)
         entropy_df_list.append(localkey_entropy_df)
     entropy_df = pd.concat(entropy_df_list)
+    # smallest integer dtype for the years (int16), a column with missing years stays float
+    entropy_df['year'] = pd.to_numeric(entropy_df['year'], downcast='integer')
     entropy_df['era'] = entropy_df['year'].apply(lambda x: util.determine_era_based_on_year(x))
     return entropy_df
 
@@ -65,16 +74,15 @@ def assemble_corpus_localkey_entropy_df(metacorpora_path: str,
     A dataframe of corpus localkey entropy: corpus entropy, year, era
     The entropy of key labels in a corpus.
     """
-    metacorpora = MetaCorporaInfo.from_directory(metacorpora_path=metacorpora_path)
+    metacorpora = _load_metacorpora(metacorpora_path=metacorpora_path)
+
+    if entropy_type not in ('full_seq', 'unique_seq'):
+        raise ValueError(f'Unexpected {entropy_type}')
+    localkey_entropy = _LOCALKEY_ENTROPY[entropy_type]
 
     entropy_df_list = []
     for corpusinfo in metacorpora.meta_info.corpusinfo_list:
-        if entropy_type == 'full_seq':
-            corpus_localkey_entropy = pd.Series(corpusinfo.key_info.local_key.entropy(), name='entropy')
-        elif entropy_type == 'unique_seq':
-            corpus_localkey_entropy = pd.Series(corpusinfo.key_info.local_key.unique_labels().entropy(), name='entropy')
-        else:
-            raise ValueError(f'Unexpected {entropy_type}')
+        corpus_localkey_entropy = pd.Series(localkey_entropy(corpusinfo.key_info.local_key), name='entropy')
 
         corpus_name = pd.Series(corpusinfo.meta_info.corpus_name._series.values[0], name='corpus')
         corpus_year = pd.Series(int(corpusinfo.meta_info.composed_end.mean()), name='year')
@@ -86,41 +94,40 @@ def assemble_corpus_localkey_entropy_df(metacorpora_path: str,
         corpus_entropy_df = pd.DataFrame(frame)
         entropy_df_list.append(corpus_entropy_df)
     entropy_df = pd.concat(entropy_df_list)
+    entropy_df['year'] = pd.to_numeric(entropy_df['year'], downcast='integer')
     entropy_df['era'] = entropy_df['year'].apply(lambda x: util.determine_era_based_on_year(x))
     return entropy_df
 
 
 def assemble_ms_era_df(metacorpora_path: str) -> pd.DataFrame:
-    metacorpora = MetaCorporaInfo.from_directory(metacorpora_path=metacorpora_path)
+    metacorpora = _load_metacorpora(metacorpora_path=metacorpora_path)
 
     # assemble a dataframe (modulation_bigrams_df) with cols: bigram, year, era
-    modulation_bigrams_list = []
+    # from one flat list of piece dataframes, concatenated once at the end
+    piece_df_list = []
     for corpusinfo in metacorpora.meta_info.corpusinfo_list:
-        corpus_modulation_bigrams_df_list = []
         for pieceinfo in corpusinfo.meta_info.pieceinfo_list:
-            if pieceinfo.key_info.local_key.get_changes().len() > 1:
-                piece_mod_bigrams = pd.Series(pieceinfo.harmony_info.modulation_bigrams_list(), name='bigram_str',
-                                              dtype='object')
+            # computed once per piece, a piece with at least one local key change has at least one bigram
+            bigrams = pieceinfo.harmony_info.modulation_bigrams_list()
+            if bigrams:
+                piece_mod_bigrams = pd.Series(bigrams, name='bigram_str', dtype='object')
                 piece_df_len: int = piece_mod_bigrams.shape[0]
-                piece_year = pd.Series([pieceinfo.meta_info.composed_end._series[0]] * piece_df_len, name='year',
-                                       dtype=int)
+                year = pieceinfo.meta_info.composed_end._series[0]
+                piece_year = pd.Series([year] * piece_df_len, name='year', dtype=int)
                 piece_frame = {'bigram_str': piece_mod_bigrams, 'year': piece_year}
                 piece_df = pd.DataFrame(piece_frame)
-                piece_df['era'] = piece_df['year'].apply(lambda x: util.determine_era_based_on_year(x))
-                corpus_modulation_bigrams_df_list.append(piece_df)
-            else:
-                pass
-        if len(corpus_modulation_bigrams_df_list) != 0:
-            corpus_df = pd.concat(corpus_modulation_bigrams_df_list)
-        else:
-            pass
-        modulation_bigrams_list.append(corpus_df)
-    modulation_bigrams_df = pd.concat(modulation_bigrams_list).sort_values(
+                # one year per piece, so the era is determined once per piece:
+                piece_df['era'] = util.determine_era_based_on_year(year)
+                piece_df_list.append(piece_df)
+    modulation_bigrams_df = pd.concat(piece_df_list).sort_values(
         by=['year'], ignore_index=True)  # now bigrams are str, sample row: (g_i_III  1722   Baroque)
+    modulation_bigrams_df['year'] = pd.to_numeric(modulation_bigrams_df['year'], downcast='integer')
 
-    # transform the bigram column from string to ModulationBigram instance and get the interval
-    modulation_bigrams_df['interval'] = modulation_bigrams_df['bigram_str'].apply(
-        lambda x: ModulationBigram.parse(modulation_bigram_str=x).interval())
+    # transform the bigram column from string to ModulationBigram instance and get the interval,
+    # parsing each distinct bigram once and mapping the intervals back onto the rows
+    bigram_intervals = {x: ModulationBigram.parse(modulation_bigram_str=x).interval()
+                        for x in modulation_bigrams_df['bigram_str'].unique()}
+    modulation_bigrams_df['interval'] = modulation_bigrams_df['bigram_str'].map(bigram_intervals)
 
     return modulation_bigrams_df
 
@@ -159,10 +166,13 @@ if __name__ == '__main__':
 
     fig, ax = plt.subplots(figsize=(10, 6))
     palette = util.set_plot_style_palette_4()
-    surprisal_df['interval(fifth)'] = surprisal_df['interval'].apply(
-        lambda x: pitchtypes.SpelledIntervalClass(str(x)).fifths())
+    # parse each distinct interval once and map the fifths back onto the rows
+    interval_fifths = {x: pitchtypes.SpelledIntervalClass(str(x)).fifths() for x in surprisal_df['interval'].unique()}
+    surprisal_df['interval(fifth)'] = surprisal_df['interval'].map(interval_fifths)
 
-    sns.pointplot(ax=ax, x='interval(fifth)', y='surprisal', data=surprisal_df, hue='era', palette=palette)
+    # pass seaborn only the columns it plots
+    sns.pointplot(ax=ax, x='interval(fifth)', y='surprisal', data=surprisal_df[['interval(fifth)', 'surprisal', 'era']],
+                  hue='era', palette=palette)
 
     # sns.lineplot(data=renaissance_surprisal_series, color="#046586")
     # sns.lineplot(data=baroque_surprisal_series, color="#28A9A1")
@@ -171,7 +181,8 @@ if __name__ == '__main__':
     #
     plt.title('Surprisal (information content) of modulation steps')
     plt.tight_layout()
-    plt.savefig(fname='information-theoretic-quantity-figs_new/' + 'era-ms-surprisal.jpeg', dpi=200,
+    fig_path = util.ensure_fig_dir(fig_path='information-theoretic-quantity-figs_new/')
+    plt.savefig(fname=fig_path + 'era-ms-surprisal.jpeg', dpi=200,
                 format='jpeg')
 
     # # __________________________corpus_full_seq_entropy: violinplot_____________________________
@@ -11,6 +11,15 @@ class TestGenerics(unittest.TestCase):
         matrix = TransitionMatrix(n_grams=self.test_tuple_seq)
         lable_count = matrix.get_label_counts()
 
+    def test_get_transition_matrix(self):
+        sequential = Sequential.from_sequence(sequence=['A', 'B', 'C', 'A', 'B', 'D', 'C', 'D', 'B', 'A', 'E'])
+        matrix = sequential.get_transition_matrix(probability=False)
+        self.assertEqual(list(matrix.index), ['A', 'B', 'C', 'D', 'E'])  # ordered by frequency
+        self.assertEqual(matrix.loc['A', 'B'], 2)
+        self.assertEqual(matrix.loc['B', 'A'], 1)
+        self.assertEqual(matrix.loc['E', 'A'], 0)
+        self.assertEqual(matrix.to_numpy().sum(), len(sequential) - 1)
+
     # def test_sequential_get_n_grams():
     #     n: int = 2
     #     sequence = ['1', 'sdf', '333', '8', '9']
@@ -1,6 +1,8 @@
 # Created by Xinyi Guan in 2022.
 import unittest
 
+from musana.harmony_types import Key, SpelledPitchClass
+
 
 class TestKey(unittest.TestCase):
 
@@ -10,6 +12,26 @@ class TestKey(unittest.TestCase):
     def test_pcs(self):
         raise NotImplementedError
 
+    def test_non_diatonic_pcs(self):
+        pcs = [SpelledPitchClass('C'), SpelledPitchClass('F#'), SpelledPitchClass('Bb'), SpelledPitchClass('E')]
+        self.assertEqual(Key.parse(key_str='C').non_diatonic_pcs(pcs), [SpelledPitchClass('F#'),
+                                                                         SpelledPitchClass('Bb')])
+        self.assertEqual(Key.parse(key_str='a').non_diatonic_pcs([SpelledPitchClass('G#'), SpelledPitchClass('G')]),
+                         [SpelledPitchClass('G#')])
+
+    def test_non_diatonic_pcs_with_accidentals(self):
+        # keys whose scales contain flats or sharps
+        self.assertEqual(Key.parse(key_str='F').non_diatonic_pcs([SpelledPitchClass('Bb'), SpelledPitchClass('B')]),
+                         [SpelledPitchClass('B')])
+        self.assertEqual(Key.parse(key_str='D').non_diatonic_pcs([SpelledPitchClass('F#'), SpelledPitchClass('F')]),
+                         [SpelledPitchClass('F')])
+        self.assertEqual(Key.parse(key_str='eb').non_diatonic_pcs([SpelledPitchClass('Gb'), SpelledPitchClass('Cb'),
+                                                                   SpelledPitchClass('D'), SpelledPitchClass('Db')]),
+                         [SpelledPitchClass('D')])
+        self.assertEqual(Key.parse(key_str='f#').non_diatonic_pcs([SpelledPitchClass('C#'), SpelledPitchClass('E#'),
+                                                                   SpelledPitchClass('E')]),
+                         [SpelledPitchClass('E#')])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,7 @@
 import unittest
+
+import pandas as pd
+
 from musana.harmony_types import Numeral
 
 class TestNumeral(unittest.TestCase):
@@ -9,5 +12,21 @@ class TestNumeral(unittest.TestCase):
         self.assertEqual(True, False)  # add assertion here
 
 
+class TestNumeralParseSeries(unittest.TestCase):
+    numeral_strs = pd.Series(["vii%7/IV", "##III/bIV/V", "V7", "xyz"])
+
+    def test_parse_series(self):
+        parts_df = Numeral.parse_series(numeral_strs=self.numeral_strs)
+        self.assertEqual(list(parts_df.columns), ['numeral', 'form', 'figbass', 'changes', 'relativeroot'])
+        for i, numeral_str in enumerate(self.numeral_strs):
+            match = Numeral.numeral_regex.match(numeral_str)
+            row = parts_df.iloc[i]
+            if match is None:
+                self.assertTrue(row.isna().all())
+                continue
+            for name, group in match.groupdict().items():
+                self.assertEqual(None if pd.isna(row[name]) else row[name], group)
+
+
 if __name__ == '__main__':
     unittest.main()
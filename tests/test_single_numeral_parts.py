@@ -0,0 +1,74 @@
+import re
+import unittest
+
+import pandas as pd
+
+from musana.harmony_types import SingleNumeralParts, SingleNumeralPartsArray, Numeral
+
+
+class TestSingleNumeralParts(unittest.TestCase):
+    numeral_strs = ["I", "V7", "I+(+4)", "V64(#6b5)", "V7(#9)", "#viio65(4)", "ii%43", "bbIII", "IV7(+6+2)",
+                    "ii(+4+#2)", "bIII43(b9#13)", "V+M7", "It6", "Ger65", "Fr43", "@none", "#viio2", "I()"]
+    invalid_strs = ["xyz", "ix", "b#V7", "Io5", "VIII", "I(93)", "I(+6b5)", "", "I4", "V4/V", "V+4"]
+
+    def test_parts(self):
+        snp = SingleNumeralParts.parse(numeral_str="bIII43(b9#13)")
+        self.assertEqual(snp.modifiers, "b")
+        self.assertEqual(snp.roman_numeral, "III")
+        self.assertEqual(snp.form, None)
+        self.assertEqual(snp.figbass, "43")
+        self.assertEqual(snp.added_tones, "b9#13")
+        self.assertEqual(snp.replacement_tones, None)
+
+        snp = SingleNumeralParts.parse(numeral_str="V64(#6b5)")
+        self.assertEqual(snp.added_tones, None)
+        self.assertEqual(snp.replacement_tones, "#6b5")
+
+    def test_factored_regex_agrees_with_flat_alternation(self):
+        flat_sn_regex = re.compile("^(?P<modifiers>(b*)|(#*))?"
+                                   "(?P<roman_numeral>(VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i|Ger|It|Fr|@none))"
+                                   "(?P<form>(%|o|\\+|M|\\+M))?"
+                                   "(?P<figbass>(7|65|43|42|2|64|6))?"
+                                   "(\\("
+                                   "((?P<added_tones>((\\+)([#b])?([2-8]))+|(([#b])?(9|1[0-4]))+)?|"
+                                   "(?P<replacement_tones>(([#b])?([2-8]))+)?)"
+                                   "\\))?$")
+        flat_numeral_regex = re.compile(
+            "^(?P<numeral>[b#]*(?:VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i|Ger|It|Fr|@none))(?P<form>%|o|\\+|M|\\+M)?"
+            "(?P<figbass>7|65|43|42|2|64|6)?(?:\\((?P<changes>(?:[\\+-\\^v]?[b#]*\\d)+)\\))?"
+            "(?:/(?P<relativeroot>(?:[b#]*(?:VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i)/?)*))?$")
+
+        for numeral_str in self.numeral_strs + self.invalid_strs + ["vii%7/IV", "##III/bIV/V", "ii6/V"]:
+            with self.subTest(numeral_str=numeral_str):
+                for flat, factored in [(flat_sn_regex, SingleNumeralParts._sn_regex),
+                                       (flat_numeral_regex, Numeral.numeral_regex)]:
+                    flat_match, factored_match = flat.match(numeral_str), factored.match(numeral_str)
+                    self.assertEqual(flat_match is None, factored_match is None)
+                    if flat_match is not None:
+                        self.assertEqual(flat_match.groupdict(), factored_match.groupdict())
+
+    def test_invalid(self):
+        for numeral_str in self.invalid_strs:
+            with self.subTest(numeral_str=numeral_str):
+                self.assertRaises(ValueError, lambda: SingleNumeralParts.parse(numeral_str=numeral_str))
+
+
+class TestSingleNumeralPartsArray(unittest.TestCase):
+    numeral_strs = pd.Series(["bIII43(b9#13)", "V7", "ii6", "V64(#6b5)"])
+
+    def test_from_series(self):
+        parts_array = SingleNumeralPartsArray.from_series(numeral_strs=self.numeral_strs)
+        for i, numeral_str in enumerate(self.numeral_strs):
+            snp = SingleNumeralParts.parse(numeral_str=numeral_str)
+            for name in ['roman_numeral', 'modifiers', 'form', 'figbass', 'added_tones', 'replacement_tones']:
+                value = getattr(parts_array, name)[i]
+                self.assertEqual(None if pd.isna(value) else value, getattr(snp, name))
+
+    def test_columnar_conditions(self):
+        parts_array = SingleNumeralPartsArray.from_series(numeral_strs=self.numeral_strs)
+        self.assertEqual(parts_array.is_major().tolist(), [True, True, False, True])
+        self.assertEqual(parts_array.has_seventh().tolist(), [True, True, False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from musana import util
+
+
+class TestNGrams(unittest.TestCase):
+    sequence = ['I', 'V', 'I', 'IV', 'V']
+
+    def test_get_n_grams(self):
+        self.assertEqual(util.get_n_grams(self.sequence, n=1).tolist(),
+                         [['', 'I'], ['', 'V'], ['', 'I'], ['', 'IV'], ['', 'V']])
+        self.assertEqual(util.get_n_grams(self.sequence, n=2).tolist(),
+                         [['I', 'V'], ['V', 'I'], ['I', 'IV'], ['IV', 'V']])
+        self.assertEqual(util.get_n_grams(self.sequence, n=3).tolist(),
+                         [['I_V', 'I'], ['V_I', 'IV'], ['I_IV', 'V']])
+
+    def test_get_n_grams_shorter_than_n(self):
+        self.assertEqual(util.get_n_grams(['I', 'V'], n=3).shape, (0,))
+        self.assertEqual(util.get_n_grams([], n=2).shape, (0,))
+
+    def test_get_n_grams_non_string_elements(self):
+        self.assertEqual(util.get_n_grams([1, 2.5, None, 1], n=3).tolist(),
+                         [['1_2.5', 'None'], ['2.5_None', '1']])
+
+
+class TestTransitionMatrix(unittest.TestCase):
+
+    def test_get_transition_matrix(self):
+        n_grams = util.get_n_grams(['V', 'I', 'V', 'I', 'IV', 'V', 'ii'], n=2)
+        matrix = util.get_transition_matrix(n_grams)
+        self.assertEqual(list(matrix.index), ['I', 'IV', 'V'])  # sorted contexts
+        self.assertEqual(list(matrix.columns), ['I', 'IV', 'V', 'ii'])  # sorted targets
+        self.assertEqual(matrix.to_numpy().tolist(), [[0, 1, 1, 0],
+                                                      [0, 0, 1, 0],
+                                                      [2, 0, 0, 1]])
+
+
+class TestEnsureFigDir(unittest.TestCase):
+
+    def test_ensure_fig_dir(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fig_path = os.path.join(tmp_dir, 'figs', '')
+            self.assertEqual(util.ensure_fig_dir(fig_path=fig_path), fig_path)
+            self.assertTrue(os.path.isdir(fig_path))
+            self.assertEqual(util.ensure_fig_dir(fig_path=fig_path), fig_path)  # already exists
+
+    def test_ensure_fig_dir_current_directory(self):
+        self.assertEqual(util.ensure_fig_dir(fig_path=''), '')
+
+
+if __name__ == '__main__':
+    unittest.main()